@@ -0,0 +1,2 @@
+from flipflop.backtest.replay import record_snapshots, stream_snapshots, replay
+from flipflop.backtest.engine import Backtest, BacktestReport, run_backtest, run_backtests
@@ -0,0 +1,324 @@
+"""
+Backtest Module
+
+Simulates a flip strategy against recorded Bazaar snapshots, reporting how it would have performed.
+"""
+
+import math
+import multiprocessing
+
+from typing import Callable, Iterable
+
+import settings
+
+from flipflop.bz import BazaarSession, get_buy_fill_time, get_sell_fill_time
+from flipflop.structure import Flip, NPCFlip, ChainFlip, Exit
+from flipflop.backtest.replay import replay, stream_snapshots
+
+
+class Position:
+    """An open flip, from placing the orders for its materials until the item is sold."""
+
+    item: str
+    quantity: int
+
+    npc: bool
+    insta_sell: bool
+
+    cost: float
+    revenue: float
+
+    # Time (in hours) at which the current stage of the flip is filled
+    ready_at: float
+
+    def __init__(self, item_id: str, quantity: int, cost: float, ready_at: float, *, npc: bool, insta_sell: bool):
+        self.item = item_id
+        self.quantity = quantity
+
+        self.npc = npc
+        self.insta_sell = insta_sell
+
+        self.cost = cost
+        self.revenue = None
+
+        self.ready_at = ready_at
+
+
+class BacktestReport:
+    """Backtest Report class, encompassing the performance of a strategy over a replay."""
+
+    profit: float
+    turnover: float
+
+    peak_capital: float
+    average_capital: float
+
+    trades: int
+    open_positions: int
+
+    snapshots: int
+    hours: float
+
+    def __init__(self, backtest: 'Backtest'):
+        self.profit = backtest.profit
+        self.turnover = backtest.turnover
+
+        self.peak_capital = backtest.peak_capital
+        self.average_capital = backtest.capital_hours / backtest.hours \
+            if backtest.hours \
+            else backtest.capital_used
+
+        self.trades = backtest.trades
+        self.open_positions = len(backtest.positions)
+
+        self.snapshots = backtest.snapshots
+        self.hours = backtest.hours
+
+    def __str__(self):
+        s = f'{ self.__class__.__name__ }['
+
+        for attr, value in self.__dict__.items():
+            s += f'\n    { attr }: { value }'
+
+        s += '\n]'
+
+        return s
+
+    def __repr__(self):
+        return str(self)
+
+
+class Backtest:
+    """
+    Simulates placing flips from a flip function over a replay of Bazaar snapshots.
+
+    On each snapshot, pending orders whose estimated fill time has passed are filled, and a new flip of `quantity`
+    units is opened for every item without one, provided it clears the profit thresholds and there is enough free
+    capital. Materials are bought against the depth of the snapshot the flip is opened on, and the item is sold
+    against the depth of the snapshot its materials are filled on. Sales to NPCs wait for the daily limit to reset
+    when exceeded.
+
+    Profit only accounts for completed flips, while turnover includes the materials bought for open ones.
+    """
+
+    flip_func: Callable[[str], Flip]
+    items: tuple[str]
+
+    quantity: int
+    min_profit: float
+    min_coins_per_hour: float
+
+    capital: float
+    positions: dict[str, Position]
+
+    npc_allowance: float
+    last_reset: float
+
+    def __init__(
+            self, flip_func: Callable[[str], Flip], items: Iterable[str], *,
+            quantity=1, min_profit=0, min_coins_per_hour=0, capital=math.inf
+    ):
+        self.flip_func = flip_func
+        self.items = tuple(items)
+
+        self.quantity = quantity
+        self.min_profit = min_profit
+        self.min_coins_per_hour = min_coins_per_hour
+
+        self.capital = capital
+        self.positions = {}
+
+        self.npc_allowance = settings.NPC_DAILY_LIMIT
+        self.last_reset = None
+
+        # Statistics
+        self.profit = 0
+        self.turnover = 0
+
+        self.capital_used = 0
+        self.peak_capital = 0
+        self.capital_hours = 0
+
+        self.trades = 0
+        self.snapshots = 0
+
+        self.start = None
+        self.hours = 0
+
+    """Methods"""
+
+    def run(self, snapshots: Iterable[dict]):
+        """Replays an iterable of snapshots (consumed lazily), returning the report for the whole replay."""
+
+        for hour in replay(snapshots):
+            self.step(hour)
+
+        return BacktestReport(self)
+
+    def step(self, hour: float):
+        """Advances the simulation to the snapshot currently loaded, taken at `hour`."""
+
+        if self.start is None:
+            self.start = hour
+
+        # Capital in use since the previous snapshot
+        elapsed = hour - self.start
+
+        self.capital_hours += self.capital_used * (elapsed - self.hours)
+        self.hours = elapsed
+        self.snapshots += 1
+
+        if self.last_reset is None or hour - self.last_reset >= 24:
+            self.npc_allowance = settings.NPC_DAILY_LIMIT
+            self.last_reset = hour
+
+        for position in tuple(self.positions.values()):
+            self._advance(position, hour)
+
+        for item_id in self.items:
+            if item_id not in self.positions:
+                self._open(item_id, hour)
+
+        self.peak_capital = max(self.peak_capital, self.capital_used)
+
+    '''Internals'''
+
+    def _open(self, item_id: str, hour: float):
+        """Opens a flip for an item, if it is profitable enough and can be afforded."""
+
+        from flipflop.flip.npc import get_npc_price
+
+        try:
+            flip = self.flip_func(item_id)
+
+        # Item cannot be flipped on this snapshot
+        except Exception:
+            return
+
+        if flip.profit <= self.min_profit or flip.coins_per_hour < self.min_coins_per_hour:
+            return
+
+        npc, insta_sell = _get_exit(flip)
+
+        quantity = self.quantity
+
+        if npc:
+            quantity = min(quantity, int(settings.NPC_DAILY_LIMIT // get_npc_price(item_id)))
+
+        materials = tuple(
+            (mat, qty * quantity)
+
+            for mat, qty in flip.materials
+        )
+
+        with BazaarSession() as session:
+            try:
+                for mat, qty in materials:
+                    session.buy(mat, qty)
+
+            except Exception:
+                return
+
+            cost = -session.coins
+
+        if self.capital_used + cost > self.capital:
+            return
+
+        buy_time = max(
+            get_buy_fill_time(mat, qty)
+
+            for mat, qty in materials
+        )
+
+        self.positions[item_id] = Position(item_id, quantity, cost, hour + buy_time, npc=npc, insta_sell=insta_sell)
+
+        self.capital_used += cost
+        self.turnover += cost
+
+    def _advance(self, position: Position, hour: float):
+        """Fills the current stage of a position, if its fill time has passed."""
+
+        # Materials bought; place the sale
+        if position.revenue is None:
+            if hour < position.ready_at:
+                return
+
+            revenue = self._sell(position)
+
+            if revenue is None:
+                return
+
+            position.revenue = revenue
+            position.ready_at = hour + (
+                0
+                if position.npc
+                else get_sell_fill_time(position.item, position.quantity, instant=position.insta_sell)
+            )
+
+        # Item sold; settle the position
+        if hour >= position.ready_at:
+            self.profit += position.revenue - position.cost
+            self.turnover += position.revenue
+
+            self.capital_used -= position.cost
+            self.trades += 1
+
+            del self.positions[position.item]
+
+    def _sell(self, position: Position):
+        """Returns the revenue of selling a position on the current snapshot, or ``None`` if it cannot be sold yet."""
+
+        with BazaarSession() as session:
+            try:
+                revenue = session.sell(
+                    position.item, position.quantity,
+
+                    npc=position.npc,
+                    instant=position.insta_sell
+                )
+
+            except Exception:
+                return None
+
+        if position.npc:
+            if revenue > self.npc_allowance:
+                return None
+
+            self.npc_allowance -= revenue
+
+        return revenue
+
+
+def run_backtest(path: str, flip_func: Callable[[str], Flip], items: Iterable[str], **params):
+    """Streams the snapshots recorded in a JSON lines file through a new backtest, returning its report."""
+
+    return Backtest(flip_func, items, **params).run(stream_snapshots(path))
+
+
+def run_backtests(path: str, param_sets: Iterable[dict], processes: int = None):
+    """
+    Runs a backtest for each set of parameters (passed to `run_backtest()`) in parallel, one process each.
+
+    Returns the reports in the same order as the parameter sets.
+    """
+
+    with multiprocessing.Pool(processes) as pool:
+        return pool.starmap(_run_backtest, [(path, params) for params in param_sets])
+
+
+'''Internals'''
+
+
+def _run_backtest(path: str, params: dict):
+    """Top-level wrapper around `run_backtest()`, so that it can be sent to worker processes."""
+
+    return run_backtest(path, **params)
+
+
+def _get_exit(flip: Flip):
+    """Returns whether a flip is sold to NPCs, and whether it is sold instantly (``None`` to follow the settings)."""
+
+    if isinstance(flip, ChainFlip):
+        return flip.exit is Exit.NPC, flip.exit is Exit.InstantSell
+
+    return isinstance(flip, NPCFlip), None
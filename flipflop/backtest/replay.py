@@ -0,0 +1,62 @@
+"""
+Replay Module
+
+Records Bazaar snapshots to disk, and streams them back into ``fetch_bz()`` as if they were live.
+"""
+
+import json
+import time
+
+from typing import Iterable
+
+import requests
+
+from flipflop.api import BZ_ENDPOINT, fetch_bz
+
+
+def record_snapshots(path: str, count: int, interval=60):
+    """
+    Appends `count` Bazaar snapshots to a JSON lines file, fetched every `interval` seconds.
+
+    Each line holds the time the snapshot was last updated (in milliseconds) alongside its products.
+    """
+
+    with open(path, 'a') as f:
+        for i in range(count):
+            data = requests.get(BZ_ENDPOINT).json()
+
+            f.write(json.dumps({
+                'lastUpdated': data['lastUpdated'],
+                'products': data['products']
+            }) + '\n')
+            f.flush()
+
+            if i < count - 1:
+                time.sleep(interval)
+
+
+def stream_snapshots(path: str):
+    """Lazily yields the snapshots recorded in a JSON lines file, one at a time."""
+
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay(snapshots: Iterable[dict]):
+    """
+    Loads each snapshot into ``fetch_bz()`` in turn, yielding its timestamp (in hours) once it is live.
+
+    Everything reading from the Bazaar, such as ``BazaarSession`` and the flip functions, sees the replayed snapshot
+    until the next one is yielded. Once the replay ends, the live data is restored.
+    """
+
+    try:
+        for snapshot in snapshots:
+            fetch_bz.load(snapshot['products'])
+
+            yield snapshot['lastUpdated'] / 1000 / 60 / 60
+
+    finally:
+        fetch_bz.unload()
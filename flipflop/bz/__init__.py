@@ -1,2 +1,5 @@
 from flipflop.bz.bz import is_bz_item, is_obtainable, is_decomposable, get_buy_volume, get_sell_volume
 from flipflop.bz.session import BazaarSession
+from flipflop.bz.throughput import get_buy_rate, get_sell_rate, get_npc_rate, get_buy_fill_time, get_sell_fill_time, \
+    get_fill_time, get_hourly_volume
+from flipflop.bz.book import OrderBook, BookSide, get_order_book
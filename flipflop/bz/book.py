@@ -0,0 +1,223 @@
+"""
+Order Book Module
+
+Models the full depth of a Bazaar product, beyond the orders listed in its summaries, for pricing large quantities and
+estimating how long orders take to fill.
+"""
+
+import math
+
+from bisect import bisect_left
+from itertools import accumulate
+
+from flipflop.api import fetch_bz
+from flipflop.bz.throughput import get_buy_rate, get_sell_rate
+from flipflop.utils.helpers import per_snapshot
+
+
+class BookSide:
+    """
+    One side of the order book of a product, built from its summary orders and the aggregate volume in `quick_status`.
+
+    The summaries only list the best orders. The remaining volume is assumed to be spread beyond the last listed
+    order, with prices continuing the trend of the listed ones, so that any quantity up to the total volume can be
+    priced.
+    """
+
+    item: str
+    field: str
+
+    prices: list[float]
+    amounts: list[int]
+
+    # Cumulative amount and cost up to and including each listed order
+    cumulative_amounts: list[int]
+    cumulative_costs: list[float]
+
+    # Total amount of items on this side of the book, listed or not
+    volume: int
+
+    # Change in unit price per item beyond the listed orders
+    slope: float
+
+    def __init__(self, item_id: str, field: str, orders: list[dict], volume: int):
+        self.item = item_id
+        self.field = field
+
+        self.prices = [order['pricePerUnit'] for order in orders]
+        self.amounts = [order['amount'] for order in orders]
+
+        self.cumulative_amounts = list(accumulate(self.amounts))
+        self.cumulative_costs = list(accumulate(price * amount for price, amount in zip(self.prices, self.amounts)))
+
+        self.volume = max(volume, self.listed_volume)
+
+        # The trend between the best and worst listed orders, by the amount of items listed before the worst
+        start = self.listed_volume - self.amounts[-1] \
+            if self.amounts \
+            else 0
+
+        self.slope = (self.prices[-1] - self.prices[0]) / start \
+            if start \
+            else 0
+
+    """Properties"""
+
+    @property
+    def listed_volume(self):
+        """The amount of items in the listed orders."""
+
+        return self.cumulative_amounts[-1] \
+            if self.cumulative_amounts \
+            else 0
+
+    @property
+    def best_price(self):
+        """The unit price of the best listed order."""
+
+        self._check()
+        return self.prices[0]
+
+    """Methods"""
+
+    def cost(self, quantity=1):
+        """
+        Returns the total coins for filling a quantity of items against this side of the book, best orders first.
+
+        Quantities beyond the listed orders are priced by extrapolation, up to the total volume on this side of the
+        book. Quantities exceeding it cannot be filled, and raise an error; use `exceeds_volume()` to check beforehand.
+        """
+
+        self._check()
+
+        if self.exceeds_volume(quantity):
+            raise Exception(
+                f'Quantity { quantity } exceeds the total volume of { self.volume } in field `{ self.field }` for item '
+                f'`{ self.item }`!'
+            )
+
+        if quantity <= self.listed_volume:
+            idx = bisect_left(self.cumulative_amounts, quantity)
+
+            filled_amount = self.cumulative_amounts[idx - 1] if idx else 0
+            filled_cost = self.cumulative_costs[idx - 1] if idx else 0
+
+            return filled_cost + (quantity - filled_amount) * self.prices[idx]
+
+        return self.cumulative_costs[-1] + self._extrapolated_cost(self.listed_volume, quantity)
+
+    def exceeds_volume(self, quantity=1):
+        """Returns whether a quantity exceeds the total amount of items on this side of the book."""
+
+        return quantity > self.volume
+
+    def queue_position(self):
+        """Returns the amount of items queued ahead of a new order placed at the best price."""
+
+        return self.amounts[0] \
+            if self.amounts \
+            else 0
+
+    '''Internals'''
+
+    def _check(self):
+        if not self.prices:
+            raise Exception(f'There are no available orders in field `{ self.field }` for item `{ self.item }`!')
+
+    def _extrapolated_cost(self, start: int, end: int):
+        """
+        Returns the total coins for the items between two positions past the listed orders.
+
+        Prices continue linearly from the price of the worst listed order at the end of the listed orders, and are
+        floored at zero.
+        """
+
+        origin = self.listed_volume
+
+        def price(x):
+            return self.prices[-1] + self.slope * (x - origin)
+
+        # Decreasing prices reach zero at some point, past which items are worthless
+        if self.slope < 0:
+            end = min(end, origin - self.prices[-1] / self.slope)
+
+            if end <= start:
+                return 0
+
+        return (price(start) + price(end)) / 2 * (end - start)
+
+
+class OrderBook:
+    """
+    The order book of a Bazaar product, precomputed once per snapshot.
+
+    Each side is named after the summary it is built from: ``buy_summary`` holds sell orders, which are filled by
+    instant buys, and ``sell_summary`` holds buy orders, which are filled by instant sells.
+    """
+
+    item: str
+
+    buy_summary: BookSide
+    sell_summary: BookSide
+
+    def __init__(self, item_id: str, product: dict):
+        self.item = item_id
+
+        quick_status = product['quick_status']
+
+        self.buy_summary = BookSide(item_id, 'buy_summary', product['buy_summary'], quick_status['buyVolume'])
+        self.sell_summary = BookSide(item_id, 'sell_summary', product['sell_summary'], quick_status['sellVolume'])
+
+    """Methods"""
+
+    def side(self, field: str) -> BookSide:
+        """Returns the side of the book built from a summary field."""
+
+        return getattr(self, field)
+
+    def buy_order_delay(self, quantity=1):
+        """
+        Returns the estimated time, in hours, for a buy order of a quantity at the best price to be filled.
+
+        The order is queued behind the existing orders at that price, and filled by instant sellers.
+        """
+
+        return _hours(self.sell_summary.queue_position() + quantity, get_buy_rate(self.item, instant=False))
+
+    def sell_order_delay(self, quantity=1):
+        """
+        Returns the estimated time, in hours, for a sell order of a quantity at the best price to be filled.
+
+        The order is queued behind the existing orders at that price, and filled by instant buyers.
+        """
+
+        return _hours(self.buy_summary.queue_position() + quantity, get_sell_rate(self.item, instant=False))
+
+
+@per_snapshot
+def _get_order_books(products: dict):
+    """Returns the order books built so far for the current snapshot."""
+
+    return {}
+
+
+def get_order_book(item_id: str):
+    """Returns the order book of a Bazaar product, building it on first use for the current snapshot."""
+
+    books = _get_order_books()
+
+    if item_id not in books:
+        books[item_id] = OrderBook(item_id, fetch_bz()[item_id])
+
+    return books[item_id]
+
+
+'''Internals'''
+
+
+def _hours(volume: float, hourly_rate: float):
+    """Returns the hours taken for a volume to be traded at an hourly rate, or infinity if it is never traded."""
+
+    return volume / hourly_rate \
+        if hourly_rate \
+        else math.inf
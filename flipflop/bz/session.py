@@ -1,5 +1,3 @@
-from flipflop.api import fetch_bz
-
 import settings
 
 
@@ -43,7 +41,8 @@ class BazaarSession:
         Function to buy an item at a certain quantity from the Bazaar.
 
         Returns the total cost as a negative integer.
-        Returns an error if the quantity exceeds the supply of the top 10 orders.
+        Quantities exceeding the listed orders are priced from the extrapolated order book.
+        Raises an error if an instant trade exceeds the total volume of the order book.
         """
 
         tax = settings.INSTA_BUY_UPSCALE_MULT \
@@ -63,16 +62,22 @@ class BazaarSession:
         self.coins += coins
         return coins
 
-    def sell(self, item_id: str, quantity=1, *, npc=False):
+    def sell(self, item_id: str, quantity=1, *, npc=False, instant: bool = None):
         """
         Function to sell an item at a certain quantity from the Bazaar.
 
         Returns the total cost as a negative integer.
-        Returns an error if the quantity exceeds the supply of the top 10 orders.
+        Quantities exceeding the listed orders are priced from the extrapolated order book.
+        Raises an error if an instant trade exceeds the total volume of the order book.
+
+        Accepts an optional `instant` parameter to override ``settings.USE_INSTA_SELL``.
         """
 
         from flipflop.flip.npc import get_npc_price
 
+        if instant is None:
+            instant = settings.USE_INSTA_SELL
+
         if npc:
             coins = get_npc_price(item_id) * quantity
         else:
@@ -87,7 +92,7 @@ class BazaarSession:
                 insta_field='sell_summary',
                 order_field='buy_summary',
 
-                use_instant=settings.USE_INSTA_SELL
+                use_instant=instant
             )
 
         self.coins += coins
@@ -96,16 +101,20 @@ class BazaarSession:
     def _internal_price(self, item_id: str, quantity=1, *, insta_field: str, order_field: str, use_instant: bool):
         """
         Internal function to get the buy or sell price of an item from the Bazaar.
-        Returns an error if the quantity exceeds the supply of the top 10 orders.
+
+        Prices are read from the order book of the item, which extrapolates beyond the listed orders up to the total
+        volume of the book. Instant trades exceeding that volume cannot be filled, and raise an error.
         """
 
+        from flipflop.bz.book import get_order_book
+
         if not self.in_session:
             raise Exception(
                 'Attempting to alter a BazaarSession outside of a session! '
                 'Use `with BazaarSession() as session` to create a new session.'
             )
 
-        coins = 0
+        book = get_order_book(item_id)
 
         # !
         # Buy Order
@@ -116,41 +125,12 @@ class BazaarSession:
             # of, in certain circumstances, skewing the prices by very large amounts. Stupid decision on their end,
             # but we have to live with it.
 
-            orders = fetch_bz()[item_id][order_field]
-
-            if not orders:
-                raise Exception(f'There are no available orders in field `{ order_field }` for item `{ item_id }`!')
+            # Orders are placed at the best price; see `OrderBook` for the time it takes for them to fill.
 
-            unit_price = orders[0]['pricePerUnit']
-
-            return unit_price * quantity
+            return book.side(order_field).best_price * quantity
 
         # !
         # Instant Buy
         # !
 
-        orders = fetch_bz()[item_id][insta_field]
-
-        order_idx = 0
-        while quantity > 0 and order_idx < len(orders):
-            order = orders[order_idx]
-
-            order_qty = order['amount']
-            unit_cost = order['pricePerUnit']
-
-            # Buy whole order
-            if quantity > order_qty:
-                quantity -= order_qty
-                coins += unit_cost * order_qty
-
-            # Buy part of order
-            elif quantity <= order_qty:
-                coins += unit_cost * quantity
-                quantity = 0
-
-            order_idx += 1
-
-        if quantity > 0:
-            raise Exception('Quantity exceeds supply of first 10 orders!')
-
-        return coins
+        return book.side(insta_field).cost(quantity)
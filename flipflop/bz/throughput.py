@@ -0,0 +1,151 @@
+"""
+Throughput Module
+
+Estimates fill times and hourly volumes of Bazaar products from their weekly volumes and current book depth, in order
+to rank flips by the coins they make per hour rather than solely by their per-unit profit.
+"""
+
+import settings
+
+from flipflop.utils.helpers import per_snapshot
+
+HOURS_PER_WEEK = 7 * 24
+
+
+@per_snapshot
+def get_market_rates(products: dict):
+    """
+    Returns the hourly instant buy and instant sell volumes for every product on the Bazaar.
+
+    Computed in a single pass over the market, and memoized for the current snapshot, so that per-item lookups cost
+    no more than looking up a price.
+    """
+
+    return {
+        item_id: (
+            product['quick_status']['buyMovingWeek'] / HOURS_PER_WEEK,
+            product['quick_status']['sellMovingWeek'] / HOURS_PER_WEEK
+        )
+
+        for item_id, product in products.items()
+    }
+
+
+def get_buy_rate(item_id: str, *, instant: bool = None):
+    """
+    Returns the estimated amount of an item that can be bought from the Bazaar per hour.
+
+    Instant buys compete for sell orders, which are replenished roughly as fast as they are instantly bought, whereas
+    buy orders are filled by instant sellers. Accepts an optional `instant` parameter, defaulting to
+    ``settings.USE_INSTA_BUY``.
+    """
+
+    if instant is None:
+        instant = settings.USE_INSTA_BUY
+
+    insta_buy_rate, insta_sell_rate = get_market_rates()[item_id]
+
+    return insta_buy_rate if instant else insta_sell_rate
+
+
+def get_sell_rate(item_id: str, *, instant: bool = None):
+    """
+    Returns the estimated amount of an item that can be sold to the Bazaar per hour.
+
+    The counterpart to `get_buy_rate()`. Accepts an optional `instant` parameter, defaulting to
+    ``settings.USE_INSTA_SELL``.
+    """
+
+    if instant is None:
+        instant = settings.USE_INSTA_SELL
+
+    insta_buy_rate, insta_sell_rate = get_market_rates()[item_id]
+
+    return insta_sell_rate if instant else insta_buy_rate
+
+
+def get_npc_rate(item_id: str):
+    """Returns the amount of an item that can be sold to NPCs per hour without exceeding the daily limit."""
+
+    from flipflop.flip.npc import get_npc_price
+
+    return settings.NPC_DAILY_LIMIT / get_npc_price(item_id) / 24
+
+
+def get_buy_fill_time(item_id: str, quantity=1, *, instant: bool = None):
+    """
+    Returns the estimated time, in hours, for buying a quantity of an item to be filled.
+
+    Instant buys are filled immediately. Buy orders are queued behind the existing orders at the best price, as
+    estimated by the order book.
+    """
+
+    from flipflop.bz.book import get_order_book
+
+    if instant is None:
+        instant = settings.USE_INSTA_BUY
+
+    if instant:
+        return 0
+
+    return get_order_book(item_id).buy_order_delay(quantity)
+
+
+def get_sell_fill_time(item_id: str, quantity=1, *, instant: bool = None):
+    """
+    Returns the estimated time, in hours, for selling a quantity of an item to be filled.
+
+    The counterpart to `get_buy_fill_time()`, for sell orders.
+    """
+
+    from flipflop.bz.book import get_order_book
+
+    if instant is None:
+        instant = settings.USE_INSTA_SELL
+
+    if instant:
+        return 0
+
+    return get_order_book(item_id).sell_order_delay(quantity)
+
+
+def get_fill_time(item_id: str, materials: tuple[tuple[str, int]], *, npc=False, insta_sell: bool = None):
+    """
+    Returns the estimated time, in hours, for a single flip of an item to be completed.
+
+    Materials are bought simultaneously, so the slowest material dictates when the item can be sold. Sales to NPCs are
+    immediate.
+    """
+
+    buy_time = max(
+        get_buy_fill_time(mat, qty)
+
+        for mat, qty in materials
+    )
+
+    if npc:
+        return buy_time
+
+    return buy_time + get_sell_fill_time(item_id, instant=insta_sell)
+
+
+def get_hourly_volume(item_id: str, materials: tuple[tuple[str, int]], *, npc=False, insta_sell: bool = None):
+    """
+    Returns the estimated amount of flips of an item that can be completed per hour.
+
+    This is bottlenecked by the scarcest material, or by the rate at which the item itself can be sold.
+    """
+
+    sell_rate = get_npc_rate(item_id) \
+        if npc \
+        else get_sell_rate(item_id, instant=insta_sell)
+
+    return min(
+        sell_rate,
+
+        *(
+            get_buy_rate(mat) / qty
+
+            for mat, qty in materials
+        )
+    )
@@ -1,3 +1,6 @@
 from flipflop.flip.bz_to_bz import get_order_flip
-from flipflop.flip.npc import is_npc_sellable, get_npc_price, get_npc_flip
+from flipflop.flip.npc import is_npc_sellable, get_npc_price, get_npc_flip, get_npc_chain_flip, get_npc_screen, \
+    screen_npc_flips
 from flipflop.flip.craft import is_craftable, is_craft_flippable, get_craft_flip, get_bz_materials, get_craft_materials
+from flipflop.flip.chain import get_chain_flip, search_chain_flips, get_acquisition_routes, get_exit_prices, \
+    get_route, get_best_exit
@@ -0,0 +1,284 @@
+"""
+Chain Module
+
+Searches the recipe graph for multi-step flips, where materials are bought from the Bazaar, crafted through any number
+of intermediates, and sold through the most profitable exit.
+"""
+
+import heapq
+
+from typing import Callable
+from collections import Counter, defaultdict
+
+import settings
+
+from flipflop.api import fetch_item_data, fetch_recipes
+from flipflop.bz import BazaarSession
+from flipflop.flip.craft import is_craftable, get_craft_materials
+from flipflop.structure import ChainFlip, Exit
+
+from flipflop.utils.helpers import flip, per_snapshot, to_tuple
+
+
+@per_snapshot
+def get_exit_prices(products: dict):
+    """
+    Returns the unit revenue of every possible exit for every sellable item, computed once per snapshot.
+
+    Bazaar items may be sold instantly or through a sell order, and any item with an NPC sell price may be sold to NPCs.
+    """
+
+    exits = {
+        item_id: {Exit.NPC: item['npc_sell_price']}
+
+        for item_id, item in fetch_item_data().items()
+        if 'npc_sell_price' in item
+    }
+
+    for item_id in products:
+        prices = exits.setdefault(item_id, {})
+
+        for exit_, instant in ((Exit.InstantSell, True), (Exit.SellOrder, False)):
+            price = _quote(lambda session: session.sell(item_id, instant=instant))
+
+            if price is not None:
+                prices[exit_] = price
+
+    return exits
+
+
+@per_snapshot
+def get_acquisition_routes(products: dict):
+    """
+    Returns the cheapest way of obtaining one of each item, as a tuple of its unit cost and the materials it is crafted
+    from. Items bought directly from the Bazaar have no materials.
+
+    Performs a best-first search over the recipe graph (Knuth's generalisation of Dijkstra's algorithm), finalising
+    items in increasing order of cost. A recipe is only priced once all of its materials have been finalised, which
+    also keeps the search from looping through cyclic recipes (e.g. blocks and ingots).
+
+    As no item can be sold for more than the most valuable exit on the market, the search stops once its cost reaches
+    that upper bound, pruning every item that cannot possibly be flipped for a profit.
+    """
+
+    exits = get_exit_prices()
+
+    ceiling = max(
+        (
+            max(prices.values())
+
+            for prices in exits.values()
+            if prices
+        ),
+        default=0
+    )
+
+    # Seed the search with the items that can be bought directly
+    heap = []
+
+    for item_id in products:
+        cost = _quote(lambda session: -session.buy(item_id))
+
+        if cost is not None:
+            heap.append((cost, item_id, ()))
+
+    heapq.heapify(heap)
+
+    # Index recipes by material, so that each finalised item only wakes the recipes it is used in
+    recipes = {
+        item_id: to_tuple(get_craft_materials(item_id))
+
+        for item_id in fetch_recipes()
+        if is_craftable(item_id)
+    }
+
+    used_in = defaultdict(list)
+
+    for item_id, materials in recipes.items():
+        for mat, _ in materials:
+            used_in[mat].append(item_id)
+
+    missing = {
+        item_id: len(materials)
+
+        for item_id, materials in recipes.items()
+    }
+
+    routes = {}
+
+    while heap:
+        cost, item_id, materials = heapq.heappop(heap)
+
+        if cost >= ceiling:
+            break
+
+        if item_id in routes:
+            continue
+
+        routes[item_id] = cost, materials
+
+        for product in used_in[item_id]:
+            missing[product] -= 1
+
+            if missing[product] or product in routes:
+                continue
+
+            heapq.heappush(heap, (
+                sum(qty * routes[mat][0] for mat, qty in recipes[product]),
+                product,
+                recipes[product]
+            ))
+
+    return routes
+
+
+def get_route(item_id: str):
+    """
+    Returns the steps and the Bazaar materials of the cheapest route for obtaining one of an item, as found by
+    `get_acquisition_routes()`.
+    """
+
+    routes = get_acquisition_routes()
+
+    if item_id not in routes:
+        raise Exception(
+            f'Unable to compute route. Item `{ item_id }` is not obtainable through the Bazaar for less than the most '
+            'valuable exit on the market!'
+        )
+
+    steps = []
+    _expand(item_id, 1, routes, steps)
+
+    materials = Counter()
+
+    for action, mat, qty in steps:
+        if action == 'buy':
+            materials[mat] += qty
+
+    return tuple(steps), to_tuple(materials)
+
+
+def get_best_exit(item_id: str, materials: tuple[tuple[str, int]]):
+    """
+    Returns the most profitable exit for an item obtained through its cheapest route.
+
+    If ``settings.RANK_BY_PROFIT_RATE`` is set, exits are ranked by their estimated coins per hour, which accounts for
+    how quickly the item sells through each of them. Otherwise, exits are ranked by unit price alone, in which case a
+    sell order always beats an instant sell.
+    """
+
+    from flipflop.bz import get_hourly_volume
+
+    cost, _ = get_acquisition_routes()[item_id]
+    exits = get_exit_prices().get(item_id)
+
+    if not exits:
+        raise Exception(f'Unable to compute exit. Item `{ item_id }` cannot be sold!')
+
+    if not settings.RANK_BY_PROFIT_RATE:
+        return max(exits, key=exits.get)
+
+    def coins_per_hour(exit_: Exit):
+        hourly_volume = get_hourly_volume(
+            item_id, materials,
+
+            npc=exit_ is Exit.NPC,
+            insta_sell=exit_ is Exit.InstantSell
+        )
+
+        return (exits[exit_] - cost) * hourly_volume
+
+    return max(exits, key=coins_per_hour)
+
+
+@flip(ChainFlip)
+def get_chain_flip(item_id: str):
+    """
+    Get the profit, steps, and exit of the cheapest chain obtaining an item, sold through its most profitable exit.
+
+    The chain is found using unit prices, but its Bazaar materials are priced in a session like any other flip.
+    Note that this inherits the recipe quantity bug described in `get_bz_materials()`, compounded at every step.
+    """
+
+    steps, materials = get_route(item_id)
+    exit_ = get_best_exit(item_id, materials)
+
+    with BazaarSession() as session:
+
+        for material, quantity in materials:
+            session.buy(material, quantity)
+
+        session.sell(item_id, npc=exit_ is Exit.NPC, instant=exit_ is Exit.InstantSell)
+
+        return item_id, session.coins, steps, materials, exit_
+
+
+def search_chain_flips(limit=10):
+    """
+    Returns the most profitable chain flips across every item, best first.
+
+    Chains are ranked by their estimated unit profit, and only the top `limit` are priced as flips. Chains which are
+    no longer profitable once priced are dropped.
+    """
+
+    routes = get_acquisition_routes()
+    exits = get_exit_prices()
+
+    candidates = heapq.nlargest(
+        limit,
+
+        (
+            (max(exits[item_id].values()) - cost, item_id)
+
+            for item_id, (cost, _) in routes.items()
+            if exits.get(item_id)
+        )
+    )
+
+    flips = []
+
+    for estimate, item_id in candidates:
+        if estimate <= 0:
+            break
+
+        try:
+            chain_flip = get_chain_flip(item_id)
+
+        # Materials may not be available in the quantities required by the chain
+        except Exception:
+            continue
+
+        # Pricing against the order book may turn the estimated profit into a loss
+        if chain_flip.profit > 0:
+            flips.append(chain_flip)
+
+    return sorted(flips, reverse=True)
+
+
+'''Internals'''
+
+
+def _quote(trade: Callable):
+    """Returns the coins from a single trade in a fresh session, or ``None`` if the trade is not possible."""
+
+    with BazaarSession() as session:
+        try:
+            return trade(session)
+
+        except Exception:
+            return None
+
+
+def _expand(item_id: str, quantity: int, routes: dict, steps: list):
+    """Appends the steps to obtain a quantity of an item, following its cheapest route, materials first."""
+
+    _, materials = routes[item_id]
+
+    if not materials:
+        steps.append(('buy', item_id, quantity))
+        return
+
+    for mat, qty in materials:
+        _expand(mat, qty * quantity, routes, steps)
+
+    steps.append(('craft', item_id, quantity))
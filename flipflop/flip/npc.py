@@ -4,11 +4,12 @@ NPC Module
 Computes the profits from flipping to NPCs, accounting for the daily limit.
 """
 
+import settings
 
 from flipflop.api import fetch_item_data
 from flipflop.flip.craft import get_bz_materials
-from flipflop.structure import NPCFlip
-from flipflop.utils.helpers import flip, to_tuple
+from flipflop.structure import NPCFlip, NPCChainFlip
+from flipflop.utils.helpers import flip, per_snapshot, to_tuple
 
 
 def is_npc_sellable(item_id: str):
@@ -66,7 +67,95 @@ def get_npc_flip(item_id: str):
         # Other Items
         # #
 
-        for mat, qty in to_tuple(get_bz_materials(item_id)):
+        materials = to_tuple(get_bz_materials(item_id))
+
+        for mat, qty in materials:
             session.buy(mat, qty)
 
-        return item_id, session.coins, sell_price
+        return item_id, session.coins, sell_price, materials
+
+
+@flip(NPCChainFlip)
+def get_npc_chain_flip(item_id: str):
+    """
+    Returns the profit from NPC flipping an item obtained through its cheapest route, as found by the chain search.
+
+    Unlike `get_npc_flip()`, Bazaar items may be crafted from cheaper materials rather than bought directly. This is
+    the route `get_npc_screen()` estimates, priced in a session like any other flip.
+    """
+
+    from flipflop.bz import BazaarSession
+    from flipflop.flip.chain import get_route
+
+    if not is_npc_sellable(item_id):
+        raise Exception(f'Cannot calculate NPC flip! Item `{ item_id }` cannot be sold to NPCs!')
+
+    _, materials = get_route(item_id)
+
+    with BazaarSession() as session:
+        sell_price = session.sell(item_id, npc=True)
+
+        for mat, qty in materials:
+            session.buy(mat, qty)
+
+        return item_id, session.coins, sell_price, materials
+
+
+@per_snapshot
+def get_npc_screen(products: dict):
+    """
+    Returns an estimate of every profitable NPC flip on the market, as tuples of the item, its unit profit, and its
+    maximum daily volume and profit, sorted by maximum daily profit.
+
+    Screens the whole item catalogue in a single pass per snapshot, by joining the NPC sell prices from the item data
+    with the cheapest acquisition costs found by the chain search, instead of checking items one at a time.
+    """
+
+    from flipflop.flip.chain import get_acquisition_routes
+
+    routes = get_acquisition_routes()
+
+    prices = {
+        item_id: item['npc_sell_price']
+
+        for item_id, item in fetch_item_data().items()
+        if item.get('npc_sell_price') and item_id in routes
+    }
+
+    screen = []
+
+    for item_id, price in prices.items():
+        profit = price - routes[item_id][0]
+
+        if profit <= 0:
+            continue
+
+        max_daily_volume = settings.NPC_DAILY_LIMIT // price
+        screen.append((item_id, profit, max_daily_volume, max_daily_volume * profit))
+
+    return sorted(screen, key=lambda candidate: candidate[3], reverse=True)
+
+
+def screen_npc_flips(limit=10):
+    """
+    Returns the most profitable NPC flips across the whole item catalogue, by maximum daily profit.
+
+    Candidates come from `get_npc_screen()`, and only the top `limit` are priced with `get_npc_chain_flip()`, along
+    the same routes they were screened on. Flips which are no longer profitable once priced are dropped.
+    """
+
+    flips = []
+
+    for item_id, *_ in get_npc_screen()[:limit]:
+        try:
+            npc_flip = get_npc_chain_flip(item_id)
+
+        # Materials may not be available in the quantities required by the route
+        except Exception:
+            continue
+
+        # Pricing against the order book may turn the estimated profit into a loss
+        if npc_flip.profit > 0:
+            flips.append(npc_flip)
+
+    return sorted(flips, key=lambda f: f.max_daily_profit, reverse=True)
@@ -1,4 +1,5 @@
 from flipflop.structure.flip import Flip
-from flipflop.structure.npc_flip import NPCFlip
+from flipflop.structure.npc_flip import NPCFlip, NPCChainFlip
 from flipflop.structure.craft_flip import CraftFlip
 from flipflop.structure.bz_to_bz_flip import BZToBZFlip
+from flipflop.structure.chain_flip import ChainFlip, Exit
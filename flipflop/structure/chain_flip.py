@@ -0,0 +1,48 @@
+import enum
+
+from flipflop.structure.flip import Flip
+
+
+class Exit(enum.Enum):
+
+    # Format:
+    #   Exit        = Name
+
+    InstantSell = 'instant_sell'
+    SellOrder   = 'sell_order'
+    NPC         = 'npc'
+
+
+class ChainFlip(Flip):
+    """
+    Chain Flip class, encompassing data about a multi-step flip.
+
+    Includes the steps taken, in order, to obtain the item (buying materials and crafting intermediates), the Bazaar
+    materials bought, and the exit through which the item is sold.
+    """
+
+    steps: tuple[tuple[str, str, int]]
+
+    exit: Exit
+
+    def __init__(
+            self, item_id: str, profit: int,
+            steps: tuple[tuple[str, str, int]], materials: tuple[tuple[str, int]], exit_: Exit
+    ):
+        super().__init__(
+            item_id, profit,
+
+            materials=materials,
+            npc=exit_ is Exit.NPC,
+            insta_sell=exit_ is Exit.InstantSell
+        )
+
+        self.steps = steps
+
+        self.exit = exit_
+
+    """Methods"""
+
+    def dependencies(self):
+        # The chosen route depends on the prices of every item on the market
+        return None
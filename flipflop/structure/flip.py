@@ -1,3 +1,6 @@
+import settings
+
+
 class Flip:
     """Base class for Flip() objects."""
 
@@ -7,15 +10,45 @@ class Flip:
     buy_volume: int
     sell_volume: int
 
-    def __init__(self, item_id: str, profit: int):
+    materials: tuple[tuple[str, int]]
+
+    fill_time: float
+    hourly_volume: float
+    coins_per_hour: float
+
+    def __init__(
+            self, item_id: str, profit: int, *,
+            materials: tuple[tuple[str, int]] = None, npc=False, insta_sell: bool = None
+    ):
 
-        from flipflop.bz import get_buy_volume, get_sell_volume
+        from flipflop.bz import is_bz_item, get_buy_volume, get_sell_volume, get_fill_time, get_hourly_volume
 
         self.item = item_id
         self.profit = profit
 
-        self.buy_volume = get_buy_volume(item_id)
-        self.sell_volume = get_sell_volume(item_id)
+        # Items obtained through crafting are not necessarily listed on the Bazaar themselves
+        is_bz = is_bz_item(item_id)
+
+        self.buy_volume = get_buy_volume(item_id) if is_bz else 0
+        self.sell_volume = get_sell_volume(item_id) if is_bz else 0
+
+        # Flips without materials are assumed to buy the item itself
+        self.materials = materials or ((item_id, 1),)
+
+        self.fill_time = get_fill_time(item_id, self.materials, npc=npc, insta_sell=insta_sell)
+        self.hourly_volume = get_hourly_volume(item_id, self.materials, npc=npc, insta_sell=insta_sell)
+        self.coins_per_hour = profit * self.hourly_volume
+
+    """Methods"""
+
+    def dependencies(self):
+        """
+        Returns the set of Bazaar products the flip was priced from, or ``None`` if it depends on the whole market.
+
+        Used to selectively invalidate cached flips when only some products change.
+        """
+
+        return {self.item} | {mat for mat, _ in self.materials}
 
     '''Internals'''
 
@@ -23,17 +56,24 @@ class Flip:
     # Comparison
     #
 
+    def _rank(self):
+        """Returns the metric by which flips are compared, as chosen by ``settings.RANK_BY_PROFIT_RATE``."""
+
+        return self.coins_per_hour \
+            if settings.RANK_BY_PROFIT_RATE \
+            else self.profit
+
     def __gt__(self, other):
-        return self.profit > other.profit
+        return self._rank() > other._rank()
 
     def __ge__(self, other):
-        return self.profit >= other.profit
+        return self._rank() >= other._rank()
 
     def __lt__(self, other):
-        return self.profit < other.profit
+        return self._rank() < other._rank()
 
     def __le__(self, other):
-        return self.profit <= other.profit
+        return self._rank() <= other._rank()
 
     #
     # Formatting
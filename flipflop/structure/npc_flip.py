@@ -15,10 +15,22 @@ class NPCFlip(Flip):
     max_daily_volume: int
     max_daily_profit: int
 
-    def __init__(self, item_id: str, profit: int, npc_sell_price: int):
-        super().__init__(item_id, profit)
+    def __init__(self, item_id: str, profit: int, npc_sell_price: int, materials: tuple[tuple[str, int]] = None):
+        super().__init__(item_id, profit, materials=materials, npc=True)
 
         self.npc_sell_price = npc_sell_price
 
         self.max_daily_volume = NPC_DAILY_LIMIT // npc_sell_price
         self.max_daily_profit = self.max_daily_volume * profit
+
+
+class NPCChainFlip(NPCFlip):
+    """
+    NPC Chain Flip class, encompassing data about an NPC flip of an item obtained through its cheapest route.
+    """
+
+    """Methods"""
+
+    def dependencies(self):
+        # The chosen route depends on the prices of every item on the market
+        return None
@@ -0,0 +1,148 @@
+"""
+Flip Cache File
+
+A bounded LRU cache of flip results, tied to the version of the Bazaar snapshot they were computed on.
+"""
+
+import sys
+import threading
+
+from collections import OrderedDict
+from typing import Hashable
+
+from flipflop.structure import Flip
+
+
+class FlipCache:
+    """
+    A least-recently-used cache of ``Flip()`` objects.
+
+    Each entry is stored alongside the snapshot version it is valid for, and the Bazaar products it was priced from.
+    Entries from any other version are treated as misses. When a new snapshot is loaded, `invalidate()` evicts only the
+    entries depending on products that changed, and carries the rest over to the new version.
+
+    The cache is bounded both by its amount of flips, and by their approximate total size in bytes.
+
+    The cache is thread-safe, as snapshots may be replaced by a fetch in any thread while others read flips.
+
+    NOTE: Cached flips are shared between callers, and should not be mutated.
+    """
+
+    maxsize: int
+    maxbytes: int
+
+    hits: int
+    misses: int
+
+    # Approximate total size of the cached flips, in bytes
+    nbytes: int
+
+    def __init__(self, maxsize: int, maxbytes: int):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+
+        self.hits = 0
+        self.misses = 0
+
+        self.nbytes = 0
+
+        # Format:
+        #   Key -> (Version, Dependencies, Flip, Size)
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    """Methods"""
+
+    def get(self, key: Hashable, version: int):
+        """Returns the cached flip for a key on a snapshot version, or ``None`` if there is none."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[2]
+
+    def put(self, key: Hashable, flip: Flip, version: int):
+        """Caches a flip for a key on a snapshot version, evicting the least recently used flips if full."""
+
+        size = _sizeof(flip)
+        dependencies = flip.dependencies()
+
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+
+            self._entries[key] = version, dependencies, flip, size
+            self.nbytes += size
+
+            while self._entries and (len(self._entries) > self.maxsize or self.nbytes > self.maxbytes):
+                self._evict(next(iter(self._entries)))
+
+    def invalidate(self, products: set[str], version: int):
+        """
+        Evicts every flip depending on any of the given products, or on the whole market, and carries the remaining
+        flips over to the given snapshot version.
+        """
+
+        with self._lock:
+            for key, (_, dependencies, flip, size) in tuple(self._entries.items()):
+                if dependencies is None or not dependencies.isdisjoint(products):
+                    self._evict(key)
+                else:
+                    self._entries[key] = version, dependencies, flip, size
+
+    def clear(self):
+        """Evicts every flip from the cache."""
+
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def info(self):
+        """Returns the hit and miss counters, alongside the current and maximum amount and size of cached flips."""
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+
+                'nbytes': self.nbytes,
+                'maxbytes': self.maxbytes
+            }
+
+    '''Internals'''
+
+    def _evict(self, key: Hashable):
+        # Callers must hold the lock
+        *_, size = self._entries.pop(key)
+        self.nbytes -= size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _sizeof(o: object):
+    """Returns the approximate size of an object in bytes, including the attributes and containers it holds."""
+
+    size = sys.getsizeof(o)
+
+    if isinstance(o, Flip):
+        size += _sizeof(o.__dict__)
+
+    if isinstance(o, dict):
+        size += sum(_sizeof(k) + _sizeof(v) for k, v in o.items())
+
+    elif isinstance(o, (tuple, list, set, frozenset)):
+        size += sum(_sizeof(v) for v in o)
+
+    return size
@@ -6,10 +6,18 @@ A collection of useful functions.
 
 import os
 import json
+import time
+import tempfile
+import threading
+import functools
+import contextlib
 
 from typing import Callable, cast
 
 from flipflop.structure import Flip
+from flipflop.utils import shared
+from flipflop.utils.flip_cache import FlipCache
+from flipflop.utils.scheduler import scheduler
 
 import settings
 
@@ -17,71 +25,352 @@ import settings
 '''API'''
 
 
+# Amount of times the session cache of each module has been replaced
+_versions = {module: 0 for module in settings.Modules}
+
+# Callbacks invoked with the previous and new data whenever the session cache of a module is replaced
+_listeners = {module: [] for module in settings.Modules}
+
+# Data and version of each module read by the current thread within `pinned()`
+_pins = threading.local()
+
+
+def get_version(module: settings.Modules):
+    """
+    Returns the version of a module's session cache, which is incremented every time the data is replaced.
+
+    Within `pinned()`, this is the version of the data pinned by the current thread, if any.
+    """
+
+    snapshots = getattr(_pins, 'snapshots', None)
+
+    if snapshots and module in snapshots:
+        return snapshots[module][1]
+
+    return _versions[module]
+
+
+def on_refresh(module: settings.Modules, listener: Callable[[object, object], None]):
+    """Registers a callback, receiving the previous and new data whenever the session cache of a module is replaced."""
+
+    _listeners[module].append(listener)
+
+
+@contextlib.contextmanager
+def pinned():
+    """
+    A context manager pinning the data of every module read by the current thread within it.
+
+    The first read of a module within the block is returned by every later read in the same thread, even if the data
+    is refreshed meanwhile, so that a computation spanning several reads sees a single snapshot. Nested blocks share
+    the pins of the outermost one.
+    """
+
+    if getattr(_pins, 'snapshots', None) is not None:
+        yield
+        return
+
+    _pins.snapshots = {}
+
+    try:
+        yield
+
+    finally:
+        _pins.snapshots = None
+
+
 def cache_json(module: settings.Modules):
     """
     A decorator to save to or fetch from a designated JSON data cache, if permitted by ``settings.CACHE``.
 
-    This will also save the data to a session cache, meaning it only reads from the local cache once.
+    This will also save the data to a session cache, meaning it only reads from the local cache once. Both caches are
+    considered stale after the module's interval in ``settings.REFRESH_INTERVALS``, upon which the data is fetched
+    again. Fetches go through the scheduler, so concurrent requests for the same module share a single fetch.
+
+    When ``settings.SHARED_ROLE`` is set, the producer process publishes every new session cache to consumer
+    processes, which read it from the shared snapshot instead of fetching it themselves.
+
+    Within `pinned()`, the data is only read once per thread.
     """
 
     def wrapper(fetcher: Callable):
 
         session_cache = None
 
+        # Time (monotonic) at which the session cache was fetched, or ``None`` if it never expires
+        fetched_at = None
+
+        # Session cache and fetch time replaced by `load()`, to be restored by `unload()`, or ``None`` if not loaded
+        live = None
+
+        def replace(data, timestamp: float = None, *, publish=True):
+            """
+            Replaces the session cache, bumping the module version and notifying listeners.
+
+            Unless `publish` is unset, a producer also publishes the data to consumer processes.
+            """
+
+            nonlocal session_cache, fetched_at, live
+
+            previous, session_cache = session_cache, data
+            fetched_at = timestamp
+
+            live = None
+
+            _versions[module] += 1
+
+            # Unloading may leave nothing to notify about, until the data is read again
+            if data is not None:
+                for listener in _listeners[module]:
+                    listener(previous, data)
+
+            if publish and settings.SHARED_ROLE is settings.SharedRole.Producer:
+                shared.publish(module, data)
+
+            return data
+
+        def is_stale():
+            """Returns whether the session cache is missing or has outlived the refresh interval of the module."""
+
+            interval = settings.REFRESH_INTERVALS.get(module)
+
+            if session_cache is None:
+                return True
+
+            return interval is not None \
+                and fetched_at is not None \
+                and time.monotonic() - fetched_at >= interval
+
+        @functools.wraps(fetcher)
         def _wrapper(*args, **kwargs):
-            nonlocal session_cache
 
-            # If session cache exists, just return that
-            if session_cache is not None:
+            snapshots = getattr(_pins, 'snapshots', None)
+
+            if snapshots is None:
+                return read(args, kwargs)
+
+            # Pinned; keep returning the data first read within the block
+            if module not in snapshots:
+                snapshots[module] = read(args, kwargs), _versions[module]
+
+            return snapshots[module][0]
+
+        def read(args: tuple, kwargs: dict):
+            """Returns the session cache, updating it first if it is stale."""
+
+            # Shared snapshot consumers never fetch; just pick up the latest published version, unless data was loaded
+            if settings.SHARED_ROLE is settings.SharedRole.Consumer:
+                return session_cache \
+                    if live is not None \
+                    else read_shared()
+
+            # If session cache exists and is fresh, just return that
+            if not is_stale():
                 return session_cache
 
-            # Cache exists; use it
+            return scheduler.run(module, lambda: update(args, kwargs))
+
+        def read_shared():
+            """Returns the latest version published to the shared snapshot, replacing the session cache if it is new."""
+
+            data = shared.attach(module).read()
+
+            if data is None:
+                raise Exception(f'No shared snapshot has been published for module `{ module.name }`!')
+
+            return data \
+                if data is session_cache \
+                else replace(data)
+
+        def update(args: tuple, kwargs: dict):
+            """Reads the data from the local cache if it is fresh, or fetches it otherwise."""
+
+            # Another thread may have updated the data while this one was waiting
+            if not is_stale():
+                return session_cache
+
+            # Fresh cache exists; use it
             cache_path = os.path.join(settings.CACHE_PATH, module.value)
 
             if settings.CACHE and module not in settings.REGENERATE_CACHE and os.path.exists(cache_path):
-                with open(cache_path, 'r') as f:
-                    session_cache = json.loads(f.read())
-                    return session_cache
+                interval = settings.REFRESH_INTERVALS.get(module)
+                age = time.time() - os.path.getmtime(cache_path)
 
-            # Cache does not exist, module is to be regenerated, or ``CACHE = False``; fetch data and create
-            # (if applicable)
+                if interval is None or age < interval:
+                    with open(cache_path, 'r') as f:
+                        return replace(json.loads(f.read()), time.monotonic() - age)
 
-            data = fetcher(*args, **kwargs)
-            session_cache = data
+            # Cache does not exist or is stale, module is to be regenerated, or ``CACHE = False``; fetch data and
+            # create (if applicable)
 
-            if settings.CACHE:
-                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            return fetch(args, kwargs)
+
+        def fetch(args: tuple, kwargs: dict):
+            """Fetches the data within the API rate budget, replacing the session cache and saving the local cache."""
 
-                with open(cache_path, 'w') as f:
-                    f.write(
-                        json.dumps(data)
-                    )
+            scheduler.limiter.acquire()
+            data = replace(fetcher(*args, **kwargs), time.monotonic())
+
+            if settings.CACHE:
+                _write_atomic(
+                    os.path.join(settings.CACHE_PATH, module.value),
+                    json.dumps(data)
+                )
 
             return data
 
+        def refresh(*args, **kwargs):
+            """
+            Fetches the data regardless of either cache, such as for modules only refreshed on demand.
+
+            Forced fetches never join a flight from `update()`, which may only read the local cache. Shared snapshot
+            consumers never fetch, and read the latest published version instead.
+            """
+
+            if settings.SHARED_ROLE is settings.SharedRole.Consumer:
+                return read_shared()
+
+            return scheduler.run(module, lambda: fetch(args, kwargs), forced=True)
+
+        def load(data):
+            """
+            Replaces the session cache with the given data, such as a recorded snapshot. It never expires, and is never
+            published to consumer processes, as it is not live data. Call `unload()` to restore the live data.
+            """
+
+            nonlocal live
+
+            previous = live or (session_cache, fetched_at)
+
+            replace(data, publish=False)
+            live = previous
+
+        def unload():
+            """Restores the session cache replaced by `load()`, which is updated again once stale."""
+
+            if live is not None:
+                replace(*live, publish=False)
+
+        _wrapper.refresh = refresh
+        _wrapper.load = load
+        _wrapper.unload = unload
+
         return _wrapper
 
     return wrapper
 
 
+def per_snapshot(func: Callable):
+    """
+    A decorator to memoize a function computed over the whole Bazaar for the current snapshot.
+
+    The decorated function receives the products returned by ``fetch_bz()``, and is only recomputed once the version
+    of any module or the pricing settings change, as results may also depend on the item data and recipes. The
+    computation is `pinned()`, so that it sees a single snapshot of every module, even if one is refreshed midway.
+    """
+
+    key = None
+    result = None
+
+    @functools.wraps(func)
+    def _wrapper():
+        nonlocal key, result
+
+        from flipflop.api import fetch_bz
+
+        with pinned():
+            products = fetch_bz()
+
+            if (_get_versions(), _get_pricing_policy()) != key:
+                result = func(products)
+
+                # Modules read for the first time by the computation are only loaded now
+                key = _get_versions(), _get_pricing_policy()
+
+            return result
+
+    return _wrapper
+
+
 '''Flips'''
 
 
+flip_cache = FlipCache(settings.FLIP_CACHE_SIZE, settings.FLIP_CACHE_MAX_BYTES)
+
+
 def flip(flip_obj: type[Flip]):
-    """A simple decorator to wrap flip function outputs with their corresponding ``Flip()`` objects."""
+    """
+    A simple decorator to wrap flip function outputs with their corresponding ``Flip()`` objects.
+
+    If permitted by ``settings.CACHE_FLIPS``, flips are reused from ``flip_cache`` when requested again with the same
+    arguments and pricing settings on the same Bazaar snapshot.
+    """
 
     def wrapper(flip_func: Callable):
 
+        @functools.wraps(flip_func)
         def _wrapper(*args, **kwargs):
 
-            result = flip_func(*args, **kwargs)
-            return flip_obj(*result)
+            from flipflop.api import fetch_bz
+
+            if not settings.CACHE_FLIPS:
+                with pinned():
+                    return flip_obj(*flip_func(*args, **kwargs))
+
+            # Price the flip on the snapshot it is cached for
+            with pinned():
+                fetch_bz()
+
+                key = flip_func, args, tuple(sorted(kwargs.items())), _get_pricing_policy()
+                version = get_version(settings.Modules.Bazaar)
+
+                result = flip_cache.get(key, version)
+
+                if result is None:
+                    result = flip_obj(*flip_func(*args, **kwargs))
+                    flip_cache.put(key, result, version)
+
+                return result
 
         return _wrapper
 
     return wrapper
 
 
+def _invalidate_flips(previous: dict, products: dict):
+    """Evicts the cached flips priced from Bazaar products which changed between two snapshots."""
+
+    version = _versions[settings.Modules.Bazaar]
+
+    # Listing changes affect how items are decomposed into materials, so nothing can be carried over
+    if previous is None or previous.keys() != products.keys():
+        flip_cache.clear()
+        return
+
+    flip_cache.invalidate(
+        {
+            item_id
+
+            for item_id, product in products.items()
+            if previous[item_id] != product
+        },
+        version
+    )
+
+
+def _clear_flips(previous: dict, data: dict):
+    """Evicts every cached flip when the item data or recipes change, as they may affect any of them."""
+
+    # Loading the data for the first time changes nothing
+    if previous is not None:
+        flip_cache.clear()
+
+
+on_refresh(settings.Modules.Bazaar, _invalidate_flips)
+on_refresh(settings.Modules.ItemData, _clear_flips)
+on_refresh(settings.Modules.Recipes, _clear_flips)
+
+
 '''Internals'''
 
 
@@ -102,3 +391,50 @@ def multiply(o: dict, factor: int):
         o[k] = o[k] * factor
 
     return o
+
+
+def _get_versions():
+    """Returns the version of every module, as seen by the current thread."""
+
+    return tuple(
+        get_version(module)
+
+        for module in settings.Modules
+    )
+
+
+def _write_atomic(path: str, text: str):
+    """
+    Writes a file through a temporary file renamed over it, so that readers never see a partially written file, even
+    with several threads or processes writing at once.
+    """
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+
+        os.replace(temp_path, path)
+
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _get_pricing_policy():
+    """Returns the settings which flip prices depend on, to tell apart flips computed under different settings."""
+
+    return (
+        settings.USE_INSTA_BUY,
+        settings.USE_INSTA_SELL,
+
+        settings.INSTA_BUY_UPSCALE_MULT,
+        settings.TAX_MULT,
+
+        settings.NPC_DAILY_LIMIT,
+
+        # Chain flips choose their exit by this metric
+        settings.RANK_BY_PROFIT_RATE
+    )
@@ -0,0 +1,121 @@
+"""
+Scheduler File
+
+Coordinates fetches of module data between threads, so that concurrent requests for the same module share a single
+fetch, and fetches stay within the API rate budget.
+"""
+
+import time
+import threading
+
+from typing import Callable
+
+import settings
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket, allowing up to `limit` requests in any `period` seconds.
+
+    Requests exceeding the budget block until a token is available.
+    """
+
+    limit: int
+    period: float
+
+    def __init__(self, limit: int, period: float):
+        self.limit = limit
+        self.period = period
+
+        self._tokens = limit
+        self._updated = time.monotonic()
+
+        self._lock = threading.Lock()
+
+    """Methods"""
+
+    def acquire(self):
+        """Takes a token from the bucket, waiting for one to be refilled if it is empty."""
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+
+                self._tokens = min(self.limit, self._tokens + (now - self._updated) * self.limit / self.period)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) * self.period / self.limit
+
+            time.sleep(wait)
+
+
+class _Flight:
+    """A fetch in progress, which other threads wait on for the result."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+        self.result = None
+        self.error = None
+
+
+class FetchScheduler:
+    """
+    Runs fetches for modules, at most one at a time per module (single-flight).
+
+    A thread requesting a module that is already being fetched waits for that fetch and receives its result (or
+    error), instead of starting another one. Forced fetches have flights of their own, so that they never join a fetch
+    which may not hit the API. Fetches hitting the API should take a token from `limiter` first.
+    """
+
+    limiter: RateLimiter
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    """Methods"""
+
+    def run(self, module: settings.Modules, fetch: Callable, *, forced=False):
+        """Runs a fetch for a module, or joins the one already in flight, returning its result."""
+
+        key = module, forced
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+
+            if flight.error is not None:
+                raise flight.error
+
+            return flight.result
+
+        try:
+            flight.result = fetch()
+
+        except BaseException as e:
+            flight.error = e
+            raise
+
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+            flight.done.set()
+
+        return flight.result
+
+
+scheduler = FetchScheduler(RateLimiter(settings.API_RATE_LIMIT, settings.API_RATE_PERIOD))
@@ -0,0 +1,152 @@
+"""
+Shared Snapshot File
+
+Shares the data of each module between several local processes through snapshot files, so that only a single
+producer process fetches it from the API.
+"""
+
+import os
+import json
+import time
+import struct
+import tempfile
+
+import settings
+
+# Format:
+#   Magic, Version, Payload Length
+
+HEADER = struct.Struct('<8sQQ')
+MAGIC = b'FLIPFLOP'
+
+
+def get_shared_path(module: settings.Modules):
+    """Returns the path of the snapshot file a module is shared through."""
+
+    return os.path.join(settings.SHARED_PATH, os.path.splitext(module.value)[0] + '.snapshot')
+
+
+def publish(module: settings.Modules, data):
+    """
+    Publishes the data of a module to consumer processes, under the next version after the one last published.
+
+    The snapshot is written to a temporary file and renamed over the previous one, so that consumers never see a
+    partially written snapshot, and those still reading the previous one are unaffected.
+    """
+
+    version = get_published_version(module) + 1
+
+    # JSON, rather than pickle, so that loading a snapshot can never execute code
+    payload = json.dumps(data).encode()
+
+    os.makedirs(settings.SHARED_PATH, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=settings.SHARED_PATH)
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, version, len(payload)))
+            f.write(payload)
+
+        os.replace(temp_path, get_shared_path(module))
+
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def get_published_version(module: settings.Modules):
+    """Returns the version of the snapshot last published for a module, or 0 if none has been published."""
+
+    try:
+        with open(get_shared_path(module), 'rb') as f:
+            magic, version, _ = HEADER.unpack(f.read(HEADER.size))
+
+    except (FileNotFoundError, struct.error):
+        return 0
+
+    return version \
+        if magic == MAGIC \
+        else 0
+
+
+class SharedSnapshot:
+    """
+    A read-only view of the data of a module, as published by the producer process.
+
+    The published file is checked for a new version at most once every ``settings.SHARED_POLL_INTERVAL`` seconds, by
+    its header and file id. The data is only decoded once per version; reads in between return the same object
+    without touching the file.
+
+    NOTE: Decoded data cannot be shared between processes in place, so each consumer holds its own copy of the
+    current version.
+    """
+
+    module: settings.Modules
+
+    version: int
+    data: object
+
+    def __init__(self, module: settings.Modules):
+        self.module = module
+
+        self.version = None
+        self.data = None
+
+        self._file_id = None
+        self._last_check = None
+
+    """Methods"""
+
+    def read(self):
+        """Returns the latest published data, or ``None`` if nothing has been published yet."""
+
+        now = time.monotonic()
+
+        if self._last_check is not None and now - self._last_check < settings.SHARED_POLL_INTERVAL:
+            return self.data
+
+        self._last_check = now
+
+        try:
+            stat = os.stat(get_shared_path(self.module))
+
+        except FileNotFoundError:
+            return self.data
+
+        # Every version is published as a new file, so an unchanged file needs no reading
+        file_id = stat.st_ino, stat.st_mtime_ns
+
+        if file_id != self._file_id:
+            self._attach()
+            self._file_id = file_id
+
+        return self.data
+
+    '''Internals'''
+
+    def _attach(self):
+        """Reads the published file, decoding its data if its version is new."""
+
+        with open(get_shared_path(self.module), 'rb') as f:
+            magic, version, length = HEADER.unpack(f.read(HEADER.size))
+
+            if magic != MAGIC:
+                raise Exception(f'Shared snapshot for module `{ self.module.name }` is corrupt!')
+
+            if version == self.version:
+                return
+
+            self.data = json.loads(f.read(length))
+            self.version = version
+
+
+_snapshots = {}
+
+
+def attach(module: settings.Modules):
+    """Returns the read-only shared snapshot of a module, attaching to it on first use."""
+
+    if module not in _snapshots:
+        _snapshots[module] = SharedSnapshot(module)
+
+    return _snapshots[module]
@@ -41,6 +41,47 @@ CACHE = True
 # Modules to regenerate. Ignored if ``CACHE = False``.
 REGENERATE_CACHE = (Modules.Bazaar,)
 
+# Seconds after which the data of each module is fetched again, or ``None`` to only fetch it on demand,
+# with ``refresh()``
+REFRESH_INTERVALS = {
+    Modules.Bazaar:   60,
+    Modules.ItemData: 24 * 60 * 60,
+    Modules.Recipes:  None,
+}
+
+# API rate budget: at most ``API_RATE_LIMIT`` fetches in any ``API_RATE_PERIOD`` seconds
+API_RATE_LIMIT = 60
+API_RATE_PERIOD = 60
+
+# Whether to reuse flips requested again on the same Bazaar snapshot
+CACHE_FLIPS = True
+
+# Maximum amount of flips, and their approximate total size in bytes, kept in the flip cache
+FLIP_CACHE_SIZE = 4096
+FLIP_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+
+class SharedRole(enum.Enum):
+
+    # Format:
+    #   Role      = Name
+
+    Producer  = 'producer'
+    Consumer  = 'consumer'
+
+
+# Role of this process when sharing data with other FlipFlop processes on the same host, through snapshot files
+# in ``SHARED_PATH``. The producer fetches and publishes the data; consumers only read it. ``None`` to not share data.
+#
+# NOTE: This only shares the fetches. Every process still decodes its own copy of each published version, as Python
+# objects cannot be shared between processes, so memory usage grows with the amount of processes.
+SHARED_ROLE = None
+
+SHARED_PATH = os.path.join(CACHE_PATH, 'shared')
+
+# Seconds between consumer checks for a newly published version
+SHARED_POLL_INTERVAL = 1
+
 '''
 Profit Calculation
 '''
@@ -96,6 +137,18 @@ USE_INSTA_BUY = False
 
 USE_INSTA_SELL = True
 
+# RANKING OPTION
+#   Setting to choose the metric by which flips are compared.
+#
+# > True
+#    Ranks flips by their estimated coins per hour, accounting for how
+#    quickly materials can be bought and the item can be sold.
+#
+# > False
+#    Ranks flips by their per-unit profit.
+
+RANK_BY_PROFIT_RATE = False
+
 '''
 Computed Settings
 